@@ -0,0 +1,74 @@
+# app/backend/export_artifacts.py
+
+"""
+One-off conversion of the training artifacts into the formats the API loads at startup.
+Run from app/backend after (re)training:  python export_artifacts.py
+"""
+
+import os
+
+import joblib
+import numpy as np
+
+import recommender
+
+# Plain-text title list read by the Streamlit frontend
+FRONTEND_TITLES_PATH = '../frontend/movie_titles.txt'
+
+
+def save_array(path, array):
+    """
+    Writes an .npy file through a temporary file and an atomic rename, so running
+    workers that memory-mapped the old file keep reading it instead of a half-written one.
+    """
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+def export_feature_matrix():
+    """Saves the CSR feature matrix as raw .npy arrays so workers can memory-map them."""
+    matrix = joblib.load(recommender.SPARSE_MATRIX_PATH).tocsr()
+    os.makedirs(recommender.FEATURES_DIR, exist_ok=True)
+
+    save_array(os.path.join(recommender.FEATURES_DIR, 'data.npy'), matrix.data)
+    save_array(os.path.join(recommender.FEATURES_DIR, 'indices.npy'), matrix.indices)
+    save_array(os.path.join(recommender.FEATURES_DIR, 'indptr.npy'), matrix.indptr)
+    save_array(os.path.join(recommender.FEATURES_DIR, 'shape.npy'), np.array(matrix.shape))
+    print(f"Feature matrix {matrix.shape} exported to {recommender.FEATURES_DIR}")
+
+
+def export_neighbor_table(batch_size: int = 512):
+    """
+    Precomputes the nearest neighbours of every movie so requests only slice arrays.
+    Rows keep the live-search order, so the movie itself usually comes first, but ties
+    at similarity 1.0 can move it later in its row or leave it out.
+    """
+    recommender.load_artifacts(load_neighbors=False)
+    n_items = len(recommender.movie_titles)
+    n_neighbors = recommender.NEIGHBOR_TABLE_SIZE + 1
+
+    neighbors = np.empty((n_items, n_neighbors), dtype=np.int32)
+    similarities = np.empty((n_items, n_neighbors), dtype=np.float32)
+    for start in range(0, n_items, batch_size):
+        batch = np.arange(start, min(start + batch_size, n_items))
+        neighbors[batch], similarities[batch] = recommender.search_neighbors(batch, n_neighbors)
+
+    save_array(recommender.NEIGHBORS_PATH, neighbors)
+    save_array(recommender.NEIGHBOR_SIMILARITIES_PATH, similarities)
+    print(f"Neighbour table {neighbors.shape} exported to {recommender.MODELS_DIR}")
+
+
+def export_title_list():
+    """Writes the model's movie titles one per line for the frontend's multiselect."""
+    movie_titles = joblib.load(recommender.INDEX_MAP_PATH)
+    with open(FRONTEND_TITLES_PATH, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(movie_titles) + '\n')
+    print(f"{len(movie_titles)} titles exported to {FRONTEND_TITLES_PATH}")
+
+
+if __name__ == "__main__":
+    export_feature_matrix()
+    export_neighbor_table()
+    export_title_list()
@@ -1,4 +1,5 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import List, Dict, Any
 import recommender 
@@ -9,6 +10,7 @@ class Recommendation(BaseModel):
     similarity: float
     tmdbId: int = None
     genres: str = None
+    cast: str = None
     overview: str = None
 
 class UserInput(BaseModel):
@@ -26,15 +28,19 @@ app = FastAPI(
 async def startup_event():
     """
     Called once when the application starts up. 
-    Loads the ML model and lookup tables into memory.
+    Loads the ML model and lookup tables into memory, then warms up the
+    prediction path. Both run in a worker thread so the event loop stays free.
     """
     try:
-        recommender.load_artifacts()
+        await run_in_threadpool(recommender.load_artifacts)
+        await run_in_threadpool(recommender.warmup)
         print("FastAPI: Recommendation artifacts loaded successfully.")
     except Exception as e:
         print(f"FATAL ERROR during startup: {e}")
        
 
+# With a response model FastAPI validates and serialises straight to JSON bytes in
+# pydantic-core, skipping jsonable_encoder and json.dumps.
 @app.post("/recommendations/user/", response_model=List[Recommendation])
 async def get_user_recommendations(user_input: UserInput):
     """
@@ -49,7 +55,9 @@ async def get_user_recommendations(user_input: UserInput):
 
     try:
        
-        recommendations = recommender.predict_for_user_ratings(
+        # Prediction is CPU-bound; run it in a worker thread so the event loop keeps serving.
+        recommendations = await run_in_threadpool(
+            recommender.predict_for_user_ratings,
             user_input.liked_movie_titles, 
             user_input.n_recommendations
         )
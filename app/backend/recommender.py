@@ -3,32 +3,88 @@
 import joblib
 import pandas as pd
 import numpy as np
+from scipy.sparse import csr_matrix
 import os
 import ast
+from functools import lru_cache
+from sklearn.preprocessing import normalize
+
+try:
+    import faiss
+except ImportError:  # fall back to the sklearn model
+    faiss = None
 
 
 MODELS_DIR = '../../models/'
 MODEL_PATH = os.path.join(MODELS_DIR, 'knn_recommender_model.joblib')
 INDEX_MAP_PATH = os.path.join(MODELS_DIR, 'movie_index_map.pkl')
 LOOKUP_PATH = os.path.join(MODELS_DIR, 'final_movie_lookup_df.pkl') 
+SPARSE_MATRIX_PATH = os.path.join(MODELS_DIR, 'movie_features_matrix.joblib')
+# Raw CSR arrays written by export_artifacts.py, memory-mapped so workers share pages
+FEATURES_DIR = os.path.join(MODELS_DIR, 'movie_features')
+# Precomputed item-item neighbour table written by export_artifacts.py
+NEIGHBORS_PATH = os.path.join(MODELS_DIR, 'movie_neighbors.npy')
+NEIGHBOR_SIMILARITIES_PATH = os.path.join(MODELS_DIR, 'movie_neighbor_similarities.npy')
 
 # Global variables to hold the loaded artifacts
 knn_model = None
 movie_titles = None
 movie_lookup_df = None
+movie_features_matrix = None
+title_to_idx = None
+movie_metadata = None
+# Live-search index, built on first use; the neighbour table answers normal requests
+faiss_index = None
+neighbor_table = None
+neighbor_similarities = None
+
+# Number of similar movies gathered for each liked title before aggregation
+NEIGHBORS_PER_TITLE = 5
+
+# Neighbours kept per movie in the precomputed table. The table stores one extra column
+# because the movie usually finds itself, but ties at similarity 1.0 can push it
+# further down the row or out of it entirely.
+NEIGHBOR_TABLE_SIZE = 50
 
-def load_artifacts():
+def load_artifacts(load_neighbors: bool = True):
     """
     Loads all necessary model components and lookup tables into memory once at startup.
     This function will be called by FastAPI's startup event.
+
+    Args:
+        load_neighbors: Whether to map the precomputed neighbour table. The exporter
+            turns this off so it never maps the files it is about to replace.
     """
-    global knn_model, movie_titles, movie_lookup_df
+    global knn_model, movie_titles, movie_lookup_df, movie_features_matrix, title_to_idx, movie_metadata, faiss_index, neighbor_table, neighbor_similarities
     
     print("Loading ML artifacts...")
     try:
         knn_model = joblib.load(MODEL_PATH)
         movie_titles = joblib.load(INDEX_MAP_PATH)
         movie_lookup_df = pd.read_pickle(LOOKUP_PATH)
+        # The genres/cast strings never change, so parse them once here rather than per request.
+        movie_lookup_df['genres_clean'] = movie_lookup_df['genres'].apply(lambda s: parse_json_string(s, 'name'))
+        movie_lookup_df['cast_clean'] = movie_lookup_df['cast'].apply(lambda s: parse_json_string(s, 'name'))
+        movie_lookup_df['top_cast'] = movie_lookup_df['cast_clean'].str.split(', ').str[:3].str.join(', ')
+        # Keep these fields valid for the API's Recommendation model (int id, string overview).
+        movie_lookup_df['tmdbId'] = movie_lookup_df['tmdbId'].astype(int)
+        movie_lookup_df['overview'] = movie_lookup_df['overview'].fillna('')
+        movie_features_matrix = load_feature_matrix()
+        faiss_index = None
+        if load_neighbors:
+            neighbor_table, neighbor_similarities = load_neighbor_table()
+        else:
+            neighbor_table, neighbor_similarities = None, None
+        title_to_idx = {title: idx for idx, title in enumerate(movie_titles)}
+        # Metadata columns aligned with the model's movie indices; duplicate titles keep
+        # their first row, matching the old boolean-mask lookup.
+        aligned = movie_lookup_df.drop_duplicates(subset='title').set_index('title').reindex(movie_titles)
+        movie_metadata = {
+            column: aligned[column].to_numpy()
+            for column in ('tmdbId', 'genres', 'cast', 'genres_clean', 'top_cast', 'overview')
+        }
+        # Cached rankings belong to the previous artifacts.
+        rank_similar_movies.cache_clear()
         print("ML artifacts loaded successfully.")
     except Exception as e:
         print(f"Error loading artifacts: {e}")
@@ -36,6 +92,105 @@ def load_artifacts():
         raise RuntimeError("Failed to load recommendation model artifacts.")
 
 
+def load_feature_matrix():
+    """
+    Memory-maps the exported CSR arrays, falling back to the joblib pickle
+    when export_artifacts.py has not been run.
+    """
+    if not os.path.isdir(FEATURES_DIR):
+        return joblib.load(SPARSE_MATRIX_PATH)
+
+    arrays = {
+        name: np.load(os.path.join(FEATURES_DIR, f'{name}.npy'), mmap_mode='r')
+        for name in ('data', 'indices', 'indptr')
+    }
+    shape = tuple(np.load(os.path.join(FEATURES_DIR, 'shape.npy')))
+    return csr_matrix((arrays['data'], arrays['indices'], arrays['indptr']), shape=shape)
+
+
+def load_neighbor_table():
+    """
+    Memory-maps the precomputed neighbour table, or returns (None, None) when
+    export_artifacts.py has not been run and every query must be searched live.
+    """
+    if not (os.path.exists(NEIGHBORS_PATH) and os.path.exists(NEIGHBOR_SIMILARITIES_PATH)):
+        return None, None
+    return np.load(NEIGHBORS_PATH, mmap_mode='r'), np.load(NEIGHBOR_SIMILARITIES_PATH, mmap_mode='r')
+
+
+def normalized_dense(features):
+    """Returns the rows of a sparse matrix L2-normalised as a contiguous float32 array."""
+    return np.ascontiguousarray(normalize(features).toarray(), dtype=np.float32)
+
+
+def dense_rows(features, row_indices):
+    """
+    Gathers CSR rows into a contiguous float32 block straight from indptr/indices/data,
+    skipping scipy's generic fancy-indexing path.
+    """
+    block = np.zeros((len(row_indices), features.shape[1]), dtype=np.float32)
+    for out_row, row in enumerate(row_indices):
+        start, end = features.indptr[row], features.indptr[row + 1]
+        block[out_row, features.indices[start:end]] = features.data[start:end]
+    return block
+
+
+def build_faiss_index(features):
+    """
+    Builds an exact inner-product index over the L2-normalised item vectors,
+    so search scores are cosine similarities.
+    """
+    vectors = normalized_dense(features)
+    index = faiss.IndexFlatIP(vectors.shape[1])
+    index.add(vectors)
+    return index
+
+
+def query_neighbors(query_indices, n_neighbors: int):
+    """
+    Finds the nearest movies for each query movie index, reading them from the
+    precomputed neighbour table when it is loaded and wide enough.
+
+    Returns:
+        (neighbors, similarities) arrays of shape (len(query_indices), n_neighbors),
+        most similar first. The query movie itself usually comes first, but ties at
+        similarity 1.0 can move it later in its row or leave it out.
+    """
+    if neighbor_table is not None and n_neighbors <= neighbor_table.shape[1]:
+        return neighbor_table[query_indices, :n_neighbors], neighbor_similarities[query_indices, :n_neighbors]
+
+    return search_neighbors(query_indices, n_neighbors)
+
+
+def search_neighbors(query_indices, n_neighbors: int):
+    """
+    Same as query_neighbors, but always runs a live search against the feature matrix.
+    The faiss index is a dense copy of the whole matrix, so it is only built on first use.
+    """
+    global faiss_index
+
+    if faiss is not None:
+        if faiss_index is None:
+            faiss_index = build_faiss_index(movie_features_matrix)
+        query_rows = normalize(dense_rows(movie_features_matrix, query_indices), copy=False)
+        similarities, neighbors = faiss_index.search(query_rows, n_neighbors)
+        return neighbors, similarities
+
+    # Dense float32 queries keep sklearn off its slow sparse-sparse distance path.
+    query_rows = dense_rows(movie_features_matrix, query_indices)
+    distances, neighbors = knn_model.kneighbors(query_rows, n_neighbors=n_neighbors)
+    return neighbors, 1 - distances
+
+
+def warmup():
+    """
+    Runs one full prediction so the first real request does not pay for page faults
+    on the memory-mapped artifacts, or for building the live-search index when
+    there is no neighbour table.
+    """
+    predict_for_user_ratings([movie_titles[0]])
+
+
 def get_recommendations(target_movie_title: str, n_recommendations: int = 10):
     """
     Generates recommendations by finding the nearest neighbors (most similar items) 
@@ -54,48 +209,87 @@ def get_recommendations(target_movie_title: str, n_recommendations: int = 10):
 
     try:
         
-        query_index = movie_titles.index(target_movie_title)
-        
-        
-        SPARSE_MATRIX_PATH = os.path.join(MODELS_DIR, 'movie_features_matrix.joblib')
-        movie_features_matrix = joblib.load(SPARSE_MATRIX_PATH)
+        query_index = title_to_idx[target_movie_title]
 
-        query_movie_vector = movie_features_matrix[query_index]
-        
-        distances, indices = knn_model.kneighbors(
-            query_movie_vector, n_neighbors=n_recommendations + 1
-        )
+        indices, similarities = rank_similar_movies((query_index,), n_recommendations, n_recommendations)
         
         # 4. Process results and fetch rich metadata
         results = []
         
-        for i in range(1, len(indices.flatten())):
-            recommended_title = movie_titles[indices.flatten()[i]]
-            similarity_score = 1 - distances.flatten()[i] 
-            
-            
-            metadata = movie_lookup_df[movie_lookup_df['title'] == recommended_title].iloc[0].to_dict()
-            
-           
+        for idx, similarity in zip(indices, similarities):
             result = {
-                'title': recommended_title,
-                'similarity': round(similarity_score, 4),
-                'tmdbId': metadata.get('tmdbId'),
-                'genres': metadata.get('genres'),
-                'cast': metadata.get('cast')[0:5], 
-                'overview': metadata.get('overview'),
+                'title': movie_titles[idx],
+                'similarity': round(float(similarity), 4),
+                'tmdbId': int(movie_metadata['tmdbId'][idx]),
+                'genres': movie_metadata['genres'][idx],
+                'cast': movie_metadata['cast'][idx][0:5], 
+                'overview': movie_metadata['overview'][idx],
             }
             results.append(result)
             
         return results
 
-    except ValueError:
+    except KeyError:
         return [] 
     except Exception as e:
         print(f"Prediction error: {e}")
         return []
 
 
+def aggregate_top_n(neighbors, similarities, liked_indices, n_items: int, n: int):
+    """
+    Combines the neighbour lists of several liked movies into one top-n ranking.
+
+    Scores live in a buffer indexed by movie id, so each candidate keeps its best
+    similarity in a single pass; liked movies are excluded.
+
+    Returns:
+        (movie_indices, scores) arrays, most similar first.
+    """
+    scores = np.full(n_items, -np.inf, dtype=similarities.dtype)
+    np.maximum.at(scores, neighbors.ravel(), similarities.ravel())
+    scores[liked_indices] = -np.inf
+
+    n = min(n, int(np.isfinite(scores).sum()))
+    if n <= 0:
+        return np.empty(0, dtype=np.intp), scores[:0]
+
+    top = np.argpartition(-scores, n - 1)[:n]
+    top = top[np.argsort(-scores[top], kind='stable')]
+    return top, scores[top]
+
+
+def drop_query_movies(neighbors, similarities, query_indices):
+    """
+    Removes each query movie from its own neighbour row, wherever ties placed it.
+    Rows that do not contain the query movie drop their least similar column
+    instead, so every row keeps the same number of neighbours.
+    """
+    is_query = neighbors == np.asarray(query_indices)[:, None]
+    is_query[~is_query.any(axis=1), -1] = True
+
+    keep = ~is_query
+    shape = (neighbors.shape[0], neighbors.shape[1] - 1)
+    return neighbors[keep].reshape(shape), similarities[keep].reshape(shape)
+
+
+@lru_cache(maxsize=8192)
+def rank_similar_movies(liked_indices: tuple, n_neighbors: int, n: int):
+    """
+    Ranks the top-n movies similar to a set of liked movies, using the n_neighbors
+    nearest movies of each. Artifacts are immutable at runtime, so results are
+    cached; the returned arrays are read-only because they are shared between calls.
+    """
+    query_indices = list(liked_indices)
+    neighbors, similarities = query_neighbors(query_indices, n_neighbors + 1)
+    neighbors, similarities = drop_query_movies(neighbors, similarities, query_indices)
+
+    top, scores = aggregate_top_n(neighbors, similarities, query_indices, len(movie_titles), n)
+    top.setflags(write=False)
+    scores.setflags(write=False)
+    return top, scores
+
+
 def predict_for_user_ratings(user_input_titles: list, n_recommendations: int = 10):
     """
     A full user-based prediction pipeline:
@@ -103,43 +297,36 @@ def predict_for_user_ratings(user_input_titles: list, n_recommendations: int = 1
     2. Aggregates results, sorts, and filters out already rated movies.
     """
     
-    final_recommendations = {}
-    
-    for title in user_input_titles:
- 
-        similar_items = get_recommendations(title, n_recommendations=5) 
-        
-        for item in similar_items:
-            if item['title'] not in final_recommendations:
-                final_recommendations[item['title']] = item['similarity']
-            else:
-                final_recommendations[item['title']] = max(final_recommendations[item['title']], item['similarity'])
+    if knn_model is None:
+        raise RuntimeError("Model artifacts not loaded.")
 
-    sorted_recs = sorted(final_recommendations.items(), key=lambda item: item[1], reverse=True)
-    
-    final_list = [
-        {'title': title, 'similarity': score} 
-        for title, score in sorted_recs 
-        if title not in user_input_titles
-    ][:n_recommendations] 
-    
-    enriched_list = []
-    for rec in final_list:
-        metadata = movie_lookup_df[movie_lookup_df['title'] == rec['title']].iloc[0].to_dict()
-
-        cleaned_genres = parse_json_string(metadata.get('genres'), 'name')
-        full_cast_string = parse_json_string(metadata.get('cast'), 'name')
-        top_cast = ", ".join(full_cast_string.split(', ')[:3])
-        rec.update({
-            'tmdbId': metadata.get('tmdbId'),
-            'genres': cleaned_genres,
-            'cast': top_cast,
-            'overview': metadata.get('overview'),
-        })
-        
-        enriched_list.append(rec)
-        
-    return enriched_list
+    liked_indices = {title_to_idx[title] for title in user_input_titles if title in title_to_idx}
+    if not liked_indices:
+        return []
+
+    # One neighbour search for every liked movie; sorted so the cache key ignores input order.
+    top, scores = rank_similar_movies(tuple(sorted(liked_indices)), NEIGHBORS_PER_TITLE, n_recommendations)
+
+    # Round and gather each field for all recommendations at once; tolist() yields native Python values.
+    columns = zip(
+        top.tolist(),
+        np.round(scores.astype(np.float64), 4).tolist(),
+        movie_metadata['tmdbId'][top].tolist(),
+        movie_metadata['genres_clean'][top].tolist(),
+        movie_metadata['top_cast'][top].tolist(),
+        movie_metadata['overview'][top].tolist(),
+    )
+    return [
+        {
+            'title': movie_titles[idx],
+            'similarity': similarity,
+            'tmdbId': tmdb_id,
+            'genres': genres,
+            'cast': cast,
+            'overview': overview,
+        }
+        for idx, similarity, tmdb_id, genres, cast, overview in columns
+    ]
 
 
 def parse_json_string(json_str, key_to_extract):
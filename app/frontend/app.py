@@ -5,18 +5,17 @@ import requests
 import json
 from typing import List
 import pandas as pd
-import joblib 
 import os 
 
 MODELS_DIR = 'app/frontend'
-INDEX_MAP_PATH = os.path.join(MODELS_DIR, 'movie_index_map.pkl')
+TITLES_PATH = os.path.join(MODELS_DIR, 'movie_titles.txt')
 
 @st.cache_resource
 def load_all_movie_titles():
-    """Loads the full list of movie titles used in the K-NN model."""
+    """Loads the full list of movie titles used in the K-NN model (one title per line)."""
     try:
-        
-        return joblib.load(INDEX_MAP_PATH) 
+        with open(TITLES_PATH, encoding='utf-8') as f:
+            return f.read().splitlines()
     except Exception as e:
         st.error(f"Error loading movie list: {e}")
         return []